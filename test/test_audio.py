@@ -1,4 +1,11 @@
+import datetime
 import functools
+import http.server
+import pathlib
+import re
+import shutil
+import subprocess
+import threading
 
 import pytest
 
@@ -19,17 +26,30 @@ def test_duration():
 @pytest.mark.parametrize("format", (f for f in yoop.Audio.Format))
 def test_audio_converted(format: yoop.Audio.Format):
     bitrate = yoop.Audio.Bitrate(80)
-    samplerate = yoop.Audio.Samplerate(32000)
+    samplerate = yoop.Audio.Samplerate(
+        32000 if (not format.samplerates) or (32000 in format.samplerates) else format.samplerates[-1]
+    )
     channels = yoop.Audio.Channels.mono
 
     result = audio().converted(bitrate=bitrate, samplerate=samplerate, format=format, channels=channels)
 
-    assert result.bitrate == bitrate
+    if format == yoop.Audio.Format.MP3:
+        assert result.bitrate == bitrate
     assert result.samplerate == samplerate
     assert result.format == format
     assert result.channels == channels
 
 
+def test_audio_converted_unsupported_samplerate():
+    with pytest.raises(ValueError):
+        yoop.Audio(b"data").converted(
+            bitrate=yoop.Audio.Bitrate(80),
+            samplerate=yoop.Audio.Samplerate(44100),
+            format=yoop.Audio.Format.OPUS,
+            channels=yoop.Audio.Channels.mono,
+        )
+
+
 @pytest.mark.skip(reason="expensive in terms of traffic and time")
 def test_audio_splitted():
     bitrate = yoop.Audio.Bitrate(80)
@@ -44,3 +64,164 @@ def test_audio_splitted():
         assert r.samplerate == samplerate
         assert r.format == format
         assert r.channels == channels
+
+
+class RangeHandler(http.server.SimpleHTTPRequestHandler):
+    served: list[int] = []
+
+    def do_GET(self):
+        path = pathlib.Path(self.translate_path(self.path))
+        data = path.read_bytes()
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match is None:
+            first, last = 0, len(data) - 1
+            self.send_response(200)
+        else:
+            first, last = int(match.group(1)), int(match.group(2) or len(data) - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {first}-{last}/{len(data)}")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(last - first + 1))
+        self.end_headers()
+        for offset in range(first, last + 1, 1 << 16):
+            try:
+                self.wfile.write(data[offset : min(offset + (1 << 16), last + 1)])
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            RangeHandler.served.append(min(1 << 16, last + 1 - offset))
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.mark.skipif(not (shutil.which("ffmpeg") and shutil.which("yt-dlp")), reason="needs ffmpeg and yt-dlp")
+def test_audio_section(tmp_path: pathlib.Path):
+    subprocess.run(
+        args=("ffmpeg", "-f", "lavfi", "-i", "sine=duration=600", "-b:a", "128k", str(tmp_path / "fixture.mp3")),
+        capture_output=True,
+        check=True,
+    )
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(RangeHandler, directory=str(tmp_path)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        media = yoop.Media(yoop.Url(f"http://127.0.0.1:{server.server_address[1]}/fixture.mp3"))
+        RangeHandler.served.clear()
+        result = media.audio(
+            yoop.Audio.Bitrate(float("inf")), start=datetime.timedelta(seconds=300), end=datetime.timedelta(seconds=330)
+        )
+        transferred = sum(RangeHandler.served)
+        formatted = media.audio(
+            yoop.Audio.Format.MP3, start=datetime.timedelta(seconds=300), end=datetime.timedelta(seconds=330)
+        )
+    finally:
+        server.shutdown()
+
+    assert abs(result.duration.total_seconds() - 30) < 1
+    assert formatted.info["format_name"] == "mp3"
+    assert transferred < (tmp_path / "fixture.mp3").stat().st_size / 2
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="needs ffmpeg")
+@pytest.mark.parametrize(
+    "max_bytes, parts, channels, layout",
+    (
+        (200_000, 1, 2, yoop.Audio.Channels.mono),
+        (40_000, 2, 1, yoop.Audio.Channels.mono),
+        (600_000, 1, 2, yoop.Audio.Channels.stereo),
+        (600_000, 1, 6, yoop.Audio.Channels.stereo),
+    ),
+)
+def test_audio_fitted(max_bytes: int, parts: int, channels: int, layout: yoop.Audio.Channels):
+    source = yoop.Audio(
+        subprocess.run(
+            args=(
+                "ffmpeg",
+                "-f",
+                "lavfi",
+                "-i",
+                "sine=duration=60",
+                "-ac",
+                str(channels),
+                "-metadata",
+                f"title={'long title ' * 1000}",
+                "-b:a",
+                "128k",
+                *(("-f", "mp3") if channels <= 2 else ("-c:a", "aac", "-f", "matroska")),
+                "-",
+            ),
+            capture_output=True,
+            check=True,
+        ).stdout
+    )
+
+    result = source.fitted(max_bytes)
+
+    assert len(result) == parts
+    for r in result:
+        assert len(r) <= max_bytes
+        assert r.format == yoop.Audio.Format.MP3
+        assert r.channels == layout
+    assert abs(sum(r.duration.total_seconds() for r in result) - 60) < 1
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="needs ffmpeg")
+@pytest.mark.parametrize("verify", (True, yoop.Audio.Verification.full, yoop.Audio.Verification.sampled))
+def test_audio_verification(tmp_path: pathlib.Path, verify: bool | yoop.Audio.Verification):
+    fixture = tmp_path / "fixture.mp3"
+    subprocess.run(
+        args=("ffmpeg", "-f", "lavfi", "-i", "sine=duration=60", "-b:a", "128k", str(fixture)),
+        capture_output=True,
+        check=True,
+    )
+    result = yoop.Media._streamed(("cat", str(fixture)), verify)
+    assert result.data == fixture.read_bytes()
+    if verify != yoop.Audio.Verification.sampled:
+        assert result.verified is result
+
+    with pytest.raises(ValueError):
+        yoop.Media._streamed(("sh", "-c", f"head -c 100000 {fixture}; exit 1"), verify)
+
+    corrupted = tmp_path / "corrupted.mp3"
+    data = bytearray(fixture.read_bytes())
+    for offset in range(len(data) // 8, len(data), len(data) // 8):
+        data[offset : offset + 4096] = bytes(4096)
+    corrupted.write_bytes(data)
+    with pytest.raises(ValueError):
+        yoop.Media._streamed(("cat", str(corrupted)), verify)
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="needs ffmpeg")
+@pytest.mark.parametrize("format", tuple(yoop.Audio.Format))
+def test_audio_copied(format: yoop.Audio.Format):
+    source = yoop.Audio(
+        subprocess.run(
+            args=(
+                "ffmpeg",
+                "-f",
+                "lavfi",
+                "-i",
+                "sine=duration=10",
+                "-ar",
+                "48000",
+                "-ac",
+                "2",
+                "-c:a",
+                format.encoder,
+                *(() if format.lossless else ("-b:a", "96k")),
+                *format.muxer,
+                "-",
+            ),
+            capture_output=True,
+            check=True,
+        ).stdout
+    )
+    assert source.format == format
+
+    result = source.converted(
+        bitrate=yoop.Audio.Bitrate(128),
+        samplerate=yoop.Audio.Samplerate(48000),
+        format=format,
+        channels=yoop.Audio.Channels.stereo,
+    )
+    assert result is source
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pytest
+
+from .. import yoop
+
+
+def test_interned():
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    assert yoop.Media(yoop.Url(url)) is yoop.Media(url=yoop.Url(url))
+    assert yoop.Playlist(yoop.Url(url)) is yoop.Playlist(yoop.Url(url))
+    assert yoop.Media(yoop.Url(url)) is not yoop.Playlist(yoop.Url(url))
+
+
+def test_cached_single_flight():
+    calls = []
+
+    class Extracted:
+        @yoop.Flight.Cached
+        def info(self):
+            calls.append(None)
+            time.sleep(0.1)
+            return len(calls)
+
+    extracted = Extracted()
+    threads = [threading.Thread(target=lambda: extracted.info) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert extracted.info == 1
+
+
+def test_run_failed():
+    flight = yoop.Flight()
+
+    def failing():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        flight.run("key", failing)
+    assert flight.run("key", lambda: 1) == 1
+
+
+def test_distinct():
+    assert yoop.Flight() != yoop.Flight()
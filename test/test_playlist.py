@@ -1,4 +1,6 @@
 import functools
+import json
+import subprocess
 
 import pytest
 
@@ -24,3 +26,50 @@ def test_avatar():
 def test_iteration():
     for p in playlists():
         assert isinstance(p, yoop.Playlist)
+
+
+def test_index():
+    addresses = (
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://www.youtube.com/@KaneB/playlists",
+        "https://vesselofiniquity.bandcamp.com/track/ерунда",
+    )
+    index = yoop.Playlist.Index.of(addresses)
+
+    assert len(index) == len(addresses)
+    assert tuple(index.addresses) == addresses
+    assert index.address(-1) == addresses[-1]
+    assert isinstance(index[0], yoop.Media)
+    assert isinstance(index[1], yoop.Playlist)
+    assert tuple(index[1:].addresses) == addresses[1:]
+    assert tuple(index[::-1].addresses) == addresses[::-1]
+    assert yoop.Playlist.Index.loaded(index.snapshot) == index
+    assert hash(yoop.Playlist.Index.loaded(index.snapshot)) == hash(index)
+    with pytest.raises(IndexError):
+        index.address(len(addresses))
+
+
+def test_extracted(monkeypatch: pytest.MonkeyPatch):
+    output = {
+        "id": "PLextracted",
+        "title": "Extracted",
+        "uploader": None,
+        "entries": [
+            {"url": "https://www.youtube.com/watch?v=first"},
+            {"url": None},
+            {"url": "https://www.youtube.com/watch?v=second"},
+        ],
+    }
+    monkeypatch.setattr(
+        subprocess, "run", lambda args, **_: subprocess.CompletedProcess(args, 0, json.dumps(output).encode(), b"")
+    )
+    playlist = yoop.Playlist(yoop.Url("https://www.youtube.com/playlist?list=PLextracted"))
+
+    assert playlist.id == "PLextracted"
+    assert playlist.title == "Extracted"
+    assert playlist.uploader == "NA"
+    assert len(playlist) == len(playlist.items) == 2
+    assert playlist[-1] == yoop.Media(yoop.Url("https://www.youtube.com/watch?v=second"))
+    assert [m.url.value for m in playlist[:1]] == ["https://www.youtube.com/watch?v=first"]
+    assert yoop.Playlist.extracted.ready(playlist)
+    assert all(isinstance(v, str) for v in playlist.extracted[0].values())
@@ -0,0 +1,113 @@
+import datetime
+import json
+import subprocess
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from .. import yoop
+
+
+def test_deduplicated():
+    service = yoop.Service(workers=1, depth=4).start()
+    release = threading.Event()
+    calls = []
+
+    def job():
+        calls.append(None)
+        release.wait()
+        return len(calls)
+
+    first = service.submit("key", job)
+    second = service.submit("key", job)
+    release.set()
+
+    assert first is second
+    assert first.result() == 1
+    assert len(calls) == 1
+    assert service.stats["deduplicated"] == 1
+
+
+def test_overloaded():
+    service = yoop.Service(workers=1, depth=1).start()
+    release = threading.Event()
+    started = threading.Event()
+
+    def job():
+        started.set()
+        release.wait()
+
+    running = service.submit("running", job)
+    started.wait()
+    waiting = service.submit("waiting", job)
+    with pytest.raises(yoop.Service.Overloaded):
+        service.submit("rejected", job)
+    assert service.stats["depth"] == 1
+
+    release.set()
+    running.result()
+    waiting.result()
+    assert service.stats["rejected"] == 1
+    assert service.stats["latency"]["max"] is not None
+
+
+def extracted(monkeypatch: pytest.MonkeyPatch, output: dict):
+    monkeypatch.setattr(
+        subprocess, "run", lambda args, **_: subprocess.CompletedProcess(args, 0, json.dumps(output).encode(), b"")
+    )
+
+
+def test_refreshed(monkeypatch: pytest.MonkeyPatch):
+    extracted(monkeypatch, {"id": "PLrefreshed", "entries": []})
+    service = yoop.Service(ttl=datetime.timedelta(seconds=60))
+    url = yoop.Url("https://www.youtube.com/playlist?list=PLrefreshed")
+    playlist = service.instance(yoop.Playlist, url)
+    assert playlist.id == "PLrefreshed"
+
+    assert service.instance(yoop.Playlist, url) is playlist
+    assert yoop.Playlist.extracted.ready(playlist)
+
+    assert service.instance(yoop.Playlist, url, refresh=True) is playlist
+    assert not yoop.Playlist.extracted.ready(playlist)
+    assert "id" not in playlist.__dict__
+    assert service.stats["refreshed"] == 1
+
+
+def test_warm_instance_kept(monkeypatch: pytest.MonkeyPatch):
+    extracted(monkeypatch, {"id": "PLwarm", "entries": []})
+    url = yoop.Url("https://www.youtube.com/playlist?list=PLwarm")
+    playlist = yoop.Playlist(url)
+    assert playlist.id == "PLwarm"
+
+    assert yoop.Service().instance(yoop.Playlist, url) is playlist
+    assert yoop.Playlist.extracted.ready(playlist)
+
+
+def test_statuses():
+    service = yoop.Service(address=("127.0.0.1", 0)).start()
+
+    def failing(url: yoop.Url, refresh: bool = False):
+        raise ValueError("yt-dlp failed")
+
+    object.__setattr__(service, "media_info", failing)
+    threading.Thread(target=service.server.serve_forever, daemon=True).start()
+    try:
+
+        def status(path: str):
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{service.server.server_address[1]}{path}") as response:
+                    json.load(response)
+                    return response.status
+            except urllib.error.HTTPError as e:
+                return e.code
+
+        assert status("/stats") == 200
+        assert status("/media/info") == 400
+        assert status("/media/converted?url=https://www.youtube.com/watch?v=x&format=opus&samplerate=44100") == 400
+        assert status("/media/info?url=https://www.youtube.com/watch?v=x") == 502
+        assert status("/unknown?url=https://www.youtube.com/watch?v=x") == 404
+    finally:
+        service.server.shutdown()
+        service.server.server_close()
@@ -3,30 +3,84 @@ import datetime
 import enum
 import functools
 import io
+import itertools
 import math
+import pathlib
 import re
 import subprocess
+import tempfile
 
 
 @dataclasses.dataclass(frozen=True, kw_only=False)
 class Audio:
     data: bytes
-    verify: bool = False
+    verify: "bool | Audio.Verification" = False
+    _checked: bool = dataclasses.field(default=False, init=False, repr=False, compare=False)
+
+    class Verification(enum.Enum):
+        full = "full"
+        sampled = "sampled"
+
+    windows = 3
+    window = datetime.timedelta(seconds=5)
 
     def __post_init__(self):
         if not self.data:
             raise ValueError("No data provided (empty bytes object)")
 
-        if self.verify:
-            errors = subprocess.run(
-                args=("ffmpeg", "-v", "error", "-i", "-", "-f", "null", "-"), input=self.data, capture_output=True
-            ).stderr.decode()
+        if self.verify and not self._checked:
+            errors = self.errors(
+                Audio.Verification.sampled if self.verify == Audio.Verification.sampled else Audio.Verification.full
+            )
             if errors:
                 raise ValueError(f"ffmpeg have errors checking data: {errors}")
 
+    @staticmethod
+    def _decoded(data: bytes):
+        result = Audio(data)
+        object.__setattr__(result, "verify", Audio.Verification.full)
+        object.__setattr__(result, "_checked", True)
+        return result
+
+    def errors(self, verification: Verification):
+        if verification == Audio.Verification.full:
+            return subprocess.run(
+                args=("ffmpeg", "-v", "error", "-i", "-", "-f", "null", "-"), input=self.data, capture_output=True
+            ).stderr.decode()
+
+        with tempfile.TemporaryDirectory() as directory:
+            file = pathlib.Path(directory) / "data"
+            file.write_bytes(self.data)
+            probed = subprocess.run(
+                args=("ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(file)),
+                capture_output=True,
+            )
+            try:
+                duration = float(probed.stdout.decode().strip())
+            except ValueError:
+                return probed.stderr.decode() or "unable to probe duration"
+            starts = sorted(
+                {
+                    max(0.0, (duration - Audio.window.total_seconds()) * n / max(1, Audio.windows - 1))
+                    for n in range(Audio.windows)
+                }
+            )
+            return subprocess.run(
+                args=(
+                    "ffmpeg",
+                    "-v",
+                    "error",
+                    *itertools.chain(
+                        *(("-ss", str(s), "-t", str(Audio.window.total_seconds()), "-i", str(file)) for s in starts)
+                    ),
+                    *itertools.chain(*(("-map", f"{n}:a:0", "-f", "null", "-") for n in range(len(starts)))),
+                ),
+                capture_output=True,
+            ).stderr.decode()
+
     @property
     def verified(self):
-        if self.verify:
+        if self.verify in (True, Audio.Verification.full):
             return self
         return Audio(data=self.data, verify=True)
 
@@ -44,7 +98,7 @@ class Audio:
                         "-select_streams",
                         "a:0",
                         "-show_entries",
-                        "format=bit_rate:stream=sample_rate,channels,codec_name",
+                        "format=bit_rate,format_name:stream=sample_rate,channels,codec_name",
                         "-",
                     ),
                     input=self.data,
@@ -57,6 +111,8 @@ class Audio:
     class Bitrate:
         kilobits_per_second: int | float | str
 
+        mp3 = (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 192, 224, 256, 320)
+
         def __post_init__(self):
             if self._kilobits_per_second <= 0:
                 raise ValueError
@@ -90,12 +146,17 @@ class Audio:
 
     @functools.cached_property
     def bitrate(self):
-        return Audio.Bitrate(int(float(self.info["bit_rate"]) / 1000))
+        try:
+            return Audio.Bitrate(int(float(self.info["bit_rate"]) / 1000))
+        except (KeyError, ValueError):
+            return Audio.Bitrate(max(1, round(len(self) * 8 / 1000 / self.duration.total_seconds())))
 
     @dataclasses.dataclass(kw_only=False)
     class Samplerate:
         per_second: int | str
 
+        mp3 = (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000)
+
         def __post_init__(self):
             if isinstance(self.per_second, str):
                 self.per_second = int(self.per_second)
@@ -110,31 +171,110 @@ class Audio:
         return Audio.Samplerate(int(self.info["sample_rate"]))
 
     class Format(enum.Enum):
-        # AAC  = 'aac'
+        AAC = "aac"
         # ACT  = 'act'
         # ALAC = 'ALAC'
         # APE  = 'ape'
         # AU   = 'au'
         # AWB  = 'awb'
-        # FLAC = 'flac'
-        # M4A  = 'm4a'
+        FLAC = "flac"
+        M4A = "m4a"
         # M4B  = 'm4b'
         # MOGA = 'moga'
         # MOGG = 'mog'
         MP3 = "mp3"
         # MPC  = 'mpc'
-        # OGG  = 'ogg'
-        # OPUS = 'opus'
+        OGG = "ogg"
+        OPUS = "opus"
         # RAW  = 'raw'
         # RF64 = 'rf64'
-        # WAV  = 'wav'
+        WAV = "wav"
+
+        @property
+        def codecs(self):
+            return {
+                Audio.Format.AAC: ("aac",),
+                Audio.Format.FLAC: ("flac",),
+                Audio.Format.M4A: ("aac",),
+                Audio.Format.MP3: ("mp3",),
+                Audio.Format.OGG: ("vorbis",),
+                Audio.Format.OPUS: ("opus",),
+                Audio.Format.WAV: ("pcm_s16le", "pcm_s24le", "pcm_s32le", "pcm_f32le", "pcm_u8"),
+            }[self]
+
+        @property
+        def encoder(self):
+            return {
+                Audio.Format.AAC: "aac",
+                Audio.Format.FLAC: "flac",
+                Audio.Format.M4A: "aac",
+                Audio.Format.MP3: "libmp3lame",
+                Audio.Format.OGG: "libvorbis",
+                Audio.Format.OPUS: "libopus",
+                Audio.Format.WAV: "pcm_s16le",
+            }[self]
+
+        @property
+        def muxer(self):
+            return {
+                Audio.Format.AAC: ("-f", "adts"),
+                Audio.Format.FLAC: ("-f", "flac"),
+                Audio.Format.M4A: ("-f", "ipod", "-movflags", "+frag_keyframe+empty_moov"),
+                Audio.Format.MP3: ("-f", "mp3"),
+                Audio.Format.OGG: ("-f", "ogg"),
+                Audio.Format.OPUS: ("-f", "opus"),
+                Audio.Format.WAV: ("-f", "wav"),
+            }[self]
+
+        @property
+        def containers(self):
+            return {
+                Audio.Format.AAC: ("aac",),
+                Audio.Format.FLAC: ("flac",),
+                Audio.Format.M4A: ("mov,mp4,m4a,3gp,3g2,mj2",),
+                Audio.Format.MP3: ("mp3",),
+                Audio.Format.OGG: ("ogg",),
+                Audio.Format.OPUS: ("ogg",),
+                Audio.Format.WAV: ("wav",),
+            }[self]
+
+        @property
+        def lossless(self):
+            return self in (Audio.Format.FLAC, Audio.Format.WAV)
+
+        @property
+        def acodec(self):
+            return {
+                Audio.Format.AAC: "mp4a",
+                Audio.Format.FLAC: "flac",
+                Audio.Format.M4A: "mp4a",
+                Audio.Format.MP3: "mp3",
+                Audio.Format.OGG: "vorbis",
+                Audio.Format.OPUS: "opus",
+                Audio.Format.WAV: None,
+            }[self]
+
+        @property
+        def samplerates(self) -> tuple[int, ...]:
+            return {Audio.Format.MP3: Audio.Samplerate.mp3, Audio.Format.OPUS: (8000, 12000, 16000, 24000, 48000)}.get(
+                self, ()
+            )
+
+        @property
+        def selector(self):
+            if self.acodec is None:
+                return self.value
+            return f"{self.value}/ba[acodec^={self.acodec}]"
 
         def __str__(self):
             return self.value
 
     @functools.cached_property
     def format(self):
-        return Audio.Format(self.info["codec_name"])
+        candidates = [f for f in Audio.Format if self.info["codec_name"] in f.codecs]
+        if not candidates:
+            raise ValueError(f"Unsupported codec {self.info['codec_name']}")
+        return next((f for f in candidates if self.info.get("format_name") in f.containers), candidates[0])
 
     class Channels(enum.Enum):
         mono = "1"
@@ -158,9 +298,69 @@ class Audio:
     def estimated_converted_size(self, bitrate: Bitrate):
         return self.duration.total_seconds() * bitrate._kilobits_per_second * 1024 / 8
 
-    def converted(self, bitrate: Bitrate, samplerate: Samplerate, format: Format, channels: Channels):
-        return Audio(
-            data=subprocess.run(
+    @staticmethod
+    def bound(duration: datetime.timedelta, bitrate: Bitrate):
+        return math.ceil((duration.total_seconds() + 0.1) * bitrate._kilobits_per_second * 1000 / 8 * 1.01) + 8192
+
+    @staticmethod
+    def _mp3_supports(samplerate: int, kilobits_per_second: int):
+        if samplerate >= 32000:
+            return (kilobits_per_second >= 32) and (kilobits_per_second != 144)
+        return kilobits_per_second <= 160
+
+    def fitted(
+        self,
+        max_bytes: int,
+        bitrates: tuple[Bitrate, Bitrate] = (Bitrate(8), Bitrate(320)),
+        samplerates: tuple[Samplerate, Samplerate] = (Samplerate(8000), Samplerate(48000)),
+        channels: tuple[Channels, ...] = (Channels.stereo, Channels.mono),
+        per_channel: Bitrate = Bitrate(32),
+    ):
+        if not channels:
+            raise ValueError("No channels layouts allowed")
+
+        allowed_samplerates = [
+            s for s in Audio.Samplerate.mp3 if samplerates[0].per_second <= s <= samplerates[1].per_second
+        ]
+        allowed_samplerates = [
+            s for s in allowed_samplerates if s <= self.samplerate.per_second
+        ] or allowed_samplerates[:1]
+        allowed_bitrates = [
+            b
+            for b in Audio.Bitrate.mp3
+            if (bitrates[0] <= Audio.Bitrate(b) <= bitrates[1])
+            and any(Audio._mp3_supports(s, b) for s in allowed_samplerates)
+        ]
+        if not allowed_bitrates:
+            raise ValueError(f"No mp3 parameters within bitrates {bitrates} and samplerates {samplerates}")
+        allowed_bitrates = [b for b in allowed_bitrates if Audio.Bitrate(b) <= self.bitrate] or allowed_bitrates[:1]
+
+        lowest = Audio.Bitrate(allowed_bitrates[0])
+        if Audio.bound(datetime.timedelta(), lowest) >= max_bytes:
+            raise ValueError(f"Budget of {max_bytes} bytes is too small to fit any part")
+
+        duration = self.duration
+        parts = max(1, math.ceil(Audio.bound(duration, lowest) / max_bytes))
+        while Audio.bound(duration / parts, lowest) > max_bytes:
+            parts += 1
+
+        bitrate = Audio.Bitrate(
+            max(b for b in allowed_bitrates if Audio.bound(duration / parts, Audio.Bitrate(b)) <= max_bytes)
+        )
+        samplerate = Audio.Samplerate(
+            max(s for s in allowed_samplerates if Audio._mp3_supports(s, bitrate._kilobits_per_second))
+        )
+        source = int(self.info["channels"])
+        layouts = sorted({c for c in channels if c.number <= source}, key=lambda c: c.number, reverse=True) or [
+            min(channels, key=lambda c: c.number)
+        ]
+        layout = next(
+            (c for c in layouts if bitrate._kilobits_per_second / c.number >= per_channel._kilobits_per_second),
+            layouts[-1],
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            encoded = subprocess.run(
                 args=(
                     "ffmpeg",
                     "-y",
@@ -169,21 +369,85 @@ class Audio:
                     "error",
                     "-i",
                     "-",
+                    "-map",
+                    "0:a:0",
+                    "-map_metadata",
+                    "-1",
                     "-vn",
+                    "-c:a",
+                    Audio.Format.MP3.encoder,
                     "-ar",
                     str(samplerate),
                     "-ac",
-                    str(channels.number),
+                    str(layout.number),
                     "-b:a",
                     str(bitrate),
-                    "-f",
-                    format.value,
-                    "-",
+                    *(
+                        (
+                            "-f",
+                            "segment",
+                            "-segment_format",
+                            Audio.Format.MP3.muxer[1],
+                            "-segment_times",
+                            ",".join(str(duration.total_seconds() / parts * n) for n in range(1, parts)),
+                        )
+                        if parts > 1
+                        else Audio.Format.MP3.muxer
+                    ),
+                    str(pathlib.Path(directory) / ("%05d.mp3" if parts > 1 else "00000.mp3")),
                 ),
                 input=self.data,
                 capture_output=True,
-            ).stdout
+            )
+            if encoded.returncode:
+                raise ValueError(f"ffmpeg have errors fitting data: {encoded.stderr.decode()}")
+            result = tuple(Audio(p.read_bytes()) for p in sorted(pathlib.Path(directory).iterdir()))
+
+        if len(result) != parts:
+            raise ValueError(f"Expected {parts} parts, ffmpeg produced {len(result)}")
+        for n, r in enumerate(result):
+            if len(r) > max_bytes:
+                raise ValueError(f"Part {n} takes {len(r)} bytes, more than budget of {max_bytes} bytes")
+        return result
+
+    def copyable(self, bitrate: Bitrate, samplerate: Samplerate, format: Format, channels: Channels):
+        try:
+            return (
+                (self.info["codec_name"] in format.codecs)
+                and (self.samplerate == samplerate)
+                and (self.channels == channels)
+                and (format.lossless or (self.bitrate <= bitrate))
+            )
+        except (KeyError, ValueError):
+            return False
+
+    def converted(self, bitrate: Bitrate, samplerate: Samplerate, format: Format, channels: Channels):
+        if format.samplerates and (samplerate.per_second not in format.samplerates):
+            raise ValueError(f"{format} does not support samplerate {samplerate}, use one of {format.samplerates}")
+
+        if self.copyable(bitrate=bitrate, samplerate=samplerate, format=format, channels=channels):
+            if self.info.get("format_name") in format.containers:
+                return self
+            codec = ("-map", "0:a:0", "-c:a", "copy")
+        else:
+            codec = (
+                "-c:a",
+                format.encoder,
+                "-ar",
+                str(samplerate),
+                "-ac",
+                str(channels.number),
+                *(() if format.lossless else ("-b:a", str(bitrate))),
+            )
+
+        result = subprocess.run(
+            args=("ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-i", "-", "-vn", *codec, *format.muxer, "-"),
+            input=self.data,
+            capture_output=True,
         )
+        if result.returncode:
+            raise ValueError(f"ffmpeg have errors converting data: {result.stderr.decode()}")
+        return Audio(data=result.stdout)
 
     def splitted(self, parts: int):
         if parts <= 0:
@@ -206,12 +470,12 @@ class Audio:
                         "-vn",
                         "-ar",
                         str(self.samplerate.per_second),
+                        "-c:a",
+                        self.format.encoder,
                         "-ac",
                         str(self.channels.number),
-                        "-b:a",
-                        f"{self.bitrate.kilobits_per_second}k",
-                        "-f",
-                        self.format.value,
+                        *(() if self.format.lossless else ("-b:a", f"{self.bitrate.kilobits_per_second}k")),
+                        *self.format.muxer,
                         "-",
                     ),
                     input=self.data,
@@ -0,0 +1,75 @@
+import concurrent.futures
+import dataclasses
+import threading
+import typing
+
+T = typing.TypeVar("T")
+
+
+@dataclasses.dataclass(frozen=True, kw_only=False, eq=False)
+class Flight:
+    _lock: threading.Lock = dataclasses.field(default_factory=threading.Lock, init=False, compare=False, repr=False)
+    _inflight: dict[typing.Hashable, concurrent.futures.Future] = dataclasses.field(
+        default_factory=dict, init=False, compare=False, repr=False
+    )
+
+    def run(self, key: typing.Hashable, function: typing.Callable[[], T]) -> T:
+        with self._lock:
+            leader = key not in self._inflight
+            if leader:
+                self._inflight[key] = concurrent.futures.Future()
+            future = self._inflight[key]
+        if not leader:
+            return future.result()
+        try:
+            result = function()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    @staticmethod
+    def forget(instance: object):
+        for owner in type(instance).__mro__:
+            for attribute in vars(owner).values():
+                if isinstance(attribute, Flight.Cached):
+                    instance.__dict__.pop(attribute.name, None)
+
+    class Cached(typing.Generic[T]):
+        def __init__(self, function: typing.Callable[[typing.Any], T]):
+            self.function = function
+            self.name = function.__name__
+            self.__doc__ = function.__doc__
+
+        def __set_name__(self, owner: type, name: str):
+            self.name = name
+
+        def ready(self, instance: object):
+            return self.name in instance.__dict__
+
+        @typing.overload
+        def __get__(self, instance: None, owner: type) -> "Flight.Cached[T]": ...
+
+        @typing.overload
+        def __get__(self, instance: object, owner: type) -> T: ...
+
+        def __get__(self, instance: object | None, owner: type):
+            if instance is None:
+                return self
+            cache = instance.__dict__
+            if self.name in cache:
+                return cache[self.name]
+
+            def compute():
+                if self.name not in cache:
+                    cache[self.name] = self.function(instance)
+                return cache[self.name]
+
+            return flight.run((id(instance), self.name), compute)
+
+
+flight = Flight()
@@ -0,0 +1,31 @@
+import inspect
+import threading
+import typing
+import weakref
+
+
+class Interned:
+    _instances: weakref.WeakValueDictionary[typing.Hashable, "Interned"]
+    _lock: threading.Lock
+    _signature: inspect.Signature | None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._instances = weakref.WeakValueDictionary()
+        cls._lock = threading.Lock()
+        cls._signature = None
+
+    def __new__(cls, *args, **kwargs):
+        if not (args or kwargs):
+            return super().__new__(cls)
+        if cls._signature is None:
+            cls._signature = inspect.signature(cls.__init__)
+        bound = cls._signature.bind(None, *args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(bound.arguments.values())[1:]
+        with cls._lock:
+            result = cls._instances.get(key)
+            if result is None:
+                result = super().__new__(cls)
+                cls._instances[key] = result
+            return result
@@ -3,16 +3,20 @@ import datetime
 import enum
 import functools
 import itertools
+import json
 import subprocess
+import threading
 
 import requests
 
 from .Audio import Audio
+from .Flight import Flight, flight
+from .Interned import Interned
 from .Url import Url
 
 
 @dataclasses.dataclass(frozen=True, kw_only=False)
-class Media:
+class Media(Interned):
     url: Url
 
     fields = (
@@ -45,21 +49,124 @@ class Media:
         "description",
     )
 
-    @functools.cached_property
+    @Flight.Cached
     def data(self):
         return subprocess.run(args=("yt-dlp", "-o", "-", self.url.value), capture_output=True).stdout
 
-    def audio(self, select: Audio.Bitrate | Audio.Format = Audio.Bitrate(320)):
+    def audio(
+        self,
+        select: Audio.Bitrate | Audio.Format = Audio.Bitrate(320),
+        start: datetime.timedelta | None = None,
+        end: datetime.timedelta | None = None,
+        verify: bool | Audio.Verification = False,
+    ):
+        if (start is not None) and (start < datetime.timedelta()):
+            raise ValueError(f"Start must not be negative, got {start}")
+        if (start is not None) and (end is not None) and (end <= start):
+            raise ValueError(f"End must be after start, got {start} and {end}")
+
         args: list[str] = ["yt-dlp"]
         if isinstance(select, Audio.Bitrate):
             args += select.nearest
         elif isinstance(select, Audio.Format):
-            args += ("-f", select.value)
-        args += ("-o", "-", self.url.value)
+            args += ("-f", select.selector)
+
+        if (start is None) and (end is None):
+            args += ("-o", "-", self.url.value)
+            return flight.run(("audio", self.url, select, start, end, verify), lambda: Media._streamed(args, verify))
+        return flight.run(
+            ("audio", self.url, select, start, end, verify),
+            lambda: self._section(
+                args, start, end, verify, select.muxer if isinstance(select, Audio.Format) else ("-f", "matroska")
+            ),
+        )
 
-        return Audio(subprocess.run(args=args, capture_output=True).stdout)
+    @staticmethod
+    def _streamed(args: list[str] | tuple[str, ...], verify: bool | Audio.Verification):
+        if verify not in (True, Audio.Verification.full):
+            downloaded = subprocess.run(args=args, capture_output=True)
+            if downloaded.returncode:
+                raise ValueError(f"{args[0]} failed with code {downloaded.returncode}: {downloaded.stderr.decode()}")
+            return Audio(downloaded.stdout, verify=verify)
+
+        source = subprocess.Popen(args=args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        decoder = subprocess.Popen(
+            args=("ffmpeg", "-v", "error", "-i", "-", "-f", "null", "-"),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        errors: list[bytes] = []
+        reader = threading.Thread(target=lambda: errors.extend(iter(decoder.stderr.readline, b"")), daemon=True)
+        reader.start()
+        failures: list[bytes] = []
+        complainer = threading.Thread(target=lambda: failures.append(source.stderr.read()), daemon=True)
+        complainer.start()
+
+        data = bytearray()
+        try:
+            for chunk in iter(lambda: source.stdout.read(1 << 16), b""):
+                if errors:
+                    break
+                data += chunk
+                decoder.stdin.write(chunk)
+            decoder.stdin.close()
+        except BrokenPipeError:
+            pass
+        finally:
+            if errors:
+                source.kill()
+            source.stdout.close()
+            source.wait()
+            decoder.wait()
+            reader.join()
+            complainer.join()
+
+        if errors or decoder.returncode:
+            raise ValueError(f"ffmpeg have errors checking data: {b''.join(errors).decode()}")
+        if source.returncode:
+            raise ValueError(f"{args[0]} failed with code {source.returncode}: {b''.join(failures).decode()}")
+        return Audio._decoded(bytes(data))
+
+    def _section(
+        self,
+        select: list[str],
+        start: datetime.timedelta | None,
+        end: datetime.timedelta | None,
+        verify: bool | Audio.Verification,
+        muxer: tuple[str, ...],
+    ):
+        resolved = subprocess.run(
+            args=(*select, "--print", "%(url)s", "--print", "%(http_headers)j", self.url.value), capture_output=True
+        )
+        lines = resolved.stdout.decode().splitlines()
+        if (len(lines) < 2) or (lines[0] == "NA"):
+            raise ValueError(f"No format selected by {select[1:]} for {self.url}: {resolved.stderr.decode()}")
+        headers = json.loads(lines[1]) or {}
+        return Media._streamed(
+            (
+                "ffmpeg",
+                "-y",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                *(("-ss", str(start.total_seconds())) if start is not None else ()),
+                *(("-to", str(end.total_seconds())) if end is not None else ()),
+                *(("-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())) if headers else ()),
+                "-i",
+                lines[0],
+                "-map",
+                "0:a:0",
+                "-vn",
+                "-c:a",
+                "copy",
+                *muxer,
+                "-",
+            ),
+            verify,
+        )
 
-    @functools.cached_property
+    @Flight.Cached
     def info(self):
         return dict(
             zip(
@@ -1,18 +1,21 @@
+import array
 import base64
 import dataclasses
-import functools
-import itertools
+import json
 import math
 import re
 import subprocess
-from typing import Generator, Union, overload
+import sys
+from typing import Generator, Iterable, Union, overload
 
+from .Flight import Flight
+from .Interned import Interned
 from .Media import Media
 from .Url import Url
 
 
 @dataclasses.dataclass(frozen=True, kw_only=False)
-class Playlist:
+class Playlist(Interned):
     url: Url
 
     fields = ("playlist_id", "playlist_title", "playlist_count", "playlist_uploader", "playlist_uploader_id")
@@ -29,26 +32,100 @@ class Playlist:
             return Playlist(url)
         raise ValueError
 
-    @functools.cached_property
-    def info(self):
-        return dict(
-            zip(
-                Playlist.fields,
-                subprocess.run(
-                    args=(
-                        "yt-dlp",
-                        "--skip-download",
-                        "--playlist-items",
-                        "1",
-                        *itertools.chain(*(("--print", key) for key in Playlist.fields)),
-                        self.url.value,
-                    ),
-                    capture_output=True,
-                )
-                .stdout.decode()
-                .split("\n"),
-            )
+    @dataclasses.dataclass(frozen=True, kw_only=False)
+    class Index:
+        blob: bytes
+        offsets: array.array
+
+        def __post_init__(self):
+            if self.offsets.typecode != "Q":
+                raise ValueError(f"Offsets must be array of unsigned long long, got typecode {self.offsets.typecode}")
+            if (not len(self.offsets)) or self.offsets[0] or (self.offsets[-1] != len(self.blob)):
+                raise ValueError("Offsets do not match blob")
+
+        @staticmethod
+        def of(addresses: Iterable[str]):
+            offsets = array.array("Q", (0,))
+            blob = bytearray()
+            for a in addresses:
+                blob += a.encode()
+                offsets.append(len(blob))
+            return Playlist.Index(bytes(blob), offsets)
+
+        @staticmethod
+        def loaded(snapshot: bytes):
+            offsets = array.array("Q")
+            length = int.from_bytes(snapshot[:8], "little")
+            end = 8 + (length + 1) * offsets.itemsize
+            offsets.frombytes(snapshot[8:end])
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            return Playlist.Index(snapshot[end:], offsets)
+
+        @property
+        def snapshot(self):
+            offsets = array.array("Q", self.offsets)
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            return len(self).to_bytes(8, "little") + offsets.tobytes() + self.blob
+
+        def address(self, key: int):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError(key)
+            return self.blob[self.offsets[key] : self.offsets[key + 1]].decode()
+
+        @property
+        def addresses(self):
+            return (self.address(i) for i in range(len(self)))
+
+        @overload
+        def __getitem__(self, key: slice) -> "Playlist.Index": ...
+
+        @overload
+        def __getitem__(self, key: int) -> Union[Media, "Playlist"]: ...
+
+        def __getitem__(self, key: slice | int):
+            if isinstance(key, slice):
+                return Playlist.Index.of(self.address(i) for i in range(len(self))[key])
+            return Playlist.content(Url(self.address(key)))
+
+        def __iter__(self):
+            return (self[i] for i in range(len(self)))
+
+        def __len__(self):
+            return len(self.offsets) - 1
+
+        def __hash__(self):
+            return hash((self.blob, self.offsets.tobytes()))
+
+    @Flight.Cached
+    def extracted(self) -> tuple[dict[str, str], "Playlist.Index"]:
+        output = subprocess.run(
+            args=("yt-dlp", "--flat-playlist", "--dump-single-json", self.url.value), capture_output=True
+        ).stdout
+        if not output.strip():
+            return {}, Playlist.Index.of(())
+        extracted = json.loads(output)
+
+        info = {}
+        for field in Playlist.fields:
+            value = extracted.get(field, extracted.get(field.removeprefix("playlist_")))
+            info[field] = "NA" if value is None else str(value)
+        index = Playlist.Index.of(
+            entry["url"]
+            for entry in extracted.get("entries") or ()
+            if entry.get("url") and (not (("bandcamp.com" in self.url.value) and entry["url"].endswith(".mp4")))
         )
+        return info, index
+
+    @Flight.Cached
+    def info(self):
+        result = dict(self.extracted[0])
+        if result and (result["playlist_count"] == "NA"):
+            result["playlist_count"] = str(len(self.items))
+        return result
 
     @overload
     def __getitem__(self, key: slice) -> Generator[Union[Media, "Playlist"], None, None]: ...
@@ -61,9 +138,9 @@ class Playlist:
             ("bandcamp.com" in self.url.value)
             and ("/track/" not in self.url.value)
             and ("/album/" not in self.url.value)
-        ):
+        ) or Playlist.extracted.ready(self):
             if isinstance(key, slice):
-                return (i for i in self.items[key])
+                return iter(self.items[key])
             return self.items[key]
         if isinstance(key, slice):
             return (
@@ -89,7 +166,7 @@ class Playlist:
         except StopIteration:
             raise IndexError
 
-    @functools.cached_property
+    @Flight.Cached
     def items(self):
         if (
             ("bandcamp.com" in self.url.value)
@@ -112,31 +189,23 @@ class Playlist:
                 )[0]
             ).decode()
             result = [
-                self.content(self.url / a) if "http" not in a else self.content(Url(a))
+                (self.url / a).value if "http" not in a else a
                 for a in re.findall(r'href="([^&\n]+)&amp;tab=music', page)
                 + re.findall(r"\"(\/(?:album|track)\/[^\"]+)\"", page)
                 + re.findall(r";(\/(?:album|track)\/[^&\"]+)(?:&|\")", page)
             ]
             for a in re.findall(r"page_url&quot;:&quot;([^&]+)&", page):
-                c = self.content(Url(a) if "http" in a else self.url / a)
+                c = a if "http" in a else (self.url / a).value
                 if c not in result:
                     result.append(c)
-            return result
+            return Playlist.Index.of(result)
 
-        return [
-            self.content(Url(address))
-            for address in subprocess.run(
-                args=("yt-dlp", "--flat-playlist", "--print", "url", self.url.value), capture_output=True
-            )
-            .stdout.decode()
-            .splitlines()
-            if address != "NA"
-        ]
+        return self.extracted[1]
 
     def __iter__(self):
         return self[::1]
 
-    @functools.cached_property
+    @Flight.Cached
     def available(self):
         if "bandcamp.com" in self.url.value:
             return True
@@ -146,21 +215,21 @@ class Playlist:
             return False
         return True
 
-    @functools.cached_property
+    @Flight.Cached
     def id(self):
         return self.info["playlist_id"]
 
-    @functools.cached_property
+    @Flight.Cached
     def title(self):
         return self.info["playlist_title"]
 
-    @functools.cached_property
+    @Flight.Cached
     def uploader(self):
         if "playlist_uploader" not in self.info:
             return "NA"
         return self.info["playlist_uploader"]
 
-    @functools.cached_property
+    @Flight.Cached
     def length(self):
         try:
             return int(self.info["playlist_count"])
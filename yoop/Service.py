@@ -0,0 +1,281 @@
+import collections
+import concurrent.futures
+import dataclasses
+import datetime
+import functools
+import http.server
+import json
+import math
+import queue
+import socket
+import socketserver
+import threading
+import time
+import typing
+import urllib.parse
+
+from .Audio import Audio
+from .Flight import Flight
+from .Media import Media
+from .Playlist import Playlist
+from .Url import Url
+
+
+@dataclasses.dataclass(frozen=True, kw_only=False)
+class Service:
+    address: tuple[str, int] | str = ("127.0.0.1", 8080)
+    workers: int = 4
+    depth: int = 64
+    cached: int = 1024
+    ttl: datetime.timedelta = datetime.timedelta(minutes=10)
+
+    _lock: threading.Lock = dataclasses.field(default_factory=threading.Lock, init=False, compare=False, repr=False)
+    _queue: queue.Queue[tuple[typing.Hashable, typing.Callable[[], typing.Any], float]] = dataclasses.field(
+        init=False, compare=False, repr=False
+    )
+    _inflight: dict[typing.Hashable, concurrent.futures.Future] = dataclasses.field(
+        default_factory=dict, init=False, compare=False, repr=False
+    )
+    _instances: collections.OrderedDict[tuple[type, Url], tuple[Media | Playlist, float]] = dataclasses.field(
+        default_factory=collections.OrderedDict, init=False, compare=False, repr=False
+    )
+    _latencies: collections.deque[float] = dataclasses.field(
+        default_factory=lambda: collections.deque(maxlen=1024), init=False, compare=False, repr=False
+    )
+    _counters: collections.Counter[str] = dataclasses.field(
+        default_factory=collections.Counter, init=False, compare=False, repr=False
+    )
+    _threads: list[threading.Thread] = dataclasses.field(default_factory=list, init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.workers <= 0:
+            raise ValueError(f"Workers number must be positive, got {self.workers}")
+        if self.depth <= 0:
+            raise ValueError(f"Queue depth must be positive, got {self.depth}")
+        if self.cached <= 0:
+            raise ValueError(f"Cache size must be positive, got {self.cached}")
+        if self.ttl <= datetime.timedelta():
+            raise ValueError(f"Time to live must be positive, got {self.ttl}")
+        if isinstance(self.address, str) and not hasattr(socket, "AF_UNIX"):
+            raise ValueError(f"Unix sockets are not supported on this platform, can not listen on {self.address}")
+        object.__setattr__(self, "_queue", queue.Queue(maxsize=self.depth))
+
+    class Overloaded(Exception):
+        pass
+
+    def instance(self, kind: type[Media] | type[Playlist], url: Url, refresh: bool = False):
+        key = (kind, url)
+        now = time.monotonic()
+        with self._lock:
+            if key in self._instances:
+                result, loaded = self._instances[key]
+                self._instances.move_to_end(key)
+                if refresh or (now - loaded > self.ttl.total_seconds()):
+                    Flight.forget(result)
+                    self._instances[key] = (result, now)
+                    self._counters["refreshed"] += 1
+                return result
+            result = kind(url)
+            self._instances[key] = (result, now)
+            if len(self._instances) > self.cached:
+                self._instances.popitem(last=False)
+            return result
+
+    def submit(self, key: typing.Hashable, job: typing.Callable[[], typing.Any]) -> concurrent.futures.Future:
+        with self._lock:
+            if key in self._inflight:
+                self._counters["deduplicated"] += 1
+                return self._inflight[key]
+            result = concurrent.futures.Future()
+            try:
+                self._queue.put_nowait((key, job, time.monotonic()))
+            except queue.Full:
+                self._counters["rejected"] += 1
+                raise Service.Overloaded(f"Queue is full ({self.depth} jobs waiting)")
+            self._inflight[key] = result
+            self._counters["submitted"] += 1
+            return result
+
+    def _work(self):
+        while True:
+            key, job, submitted = self._queue.get()
+            with self._lock:
+                future = self._inflight[key]
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(job())
+                    except Exception as e:
+                        future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                    self._latencies.append(time.monotonic() - submitted)
+                    self._counters["done"] += 1
+                self._queue.task_done()
+
+    def start(self):
+        with self._lock:
+            if not self._threads:
+                self._threads.extend(threading.Thread(target=self._work, daemon=True) for _ in range(self.workers))
+                for t in self._threads:
+                    t.start()
+        return self
+
+    @property
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "depth": self._queue.qsize(),
+                "capacity": self.depth,
+                "inflight": len(self._inflight),
+                "cached": len(self._instances),
+                **self._counters,
+                "latency": {
+                    "mean": sum(latencies) / len(latencies) if latencies else None,
+                    "median": latencies[len(latencies) // 2] if latencies else None,
+                    "p95": latencies[math.ceil(len(latencies) * 0.95) - 1] if latencies else None,
+                    "max": latencies[-1] if latencies else None,
+                },
+            }
+
+    def media_info(self, url: Url, refresh: bool = False):
+        media = self.instance(Media, url, refresh)
+        return self.submit(("media", "info", url), lambda: media.info).result()
+
+    def media_audio(
+        self,
+        url: Url,
+        select: Audio.Bitrate | Audio.Format = Audio.Bitrate(320),
+        start: datetime.timedelta | None = None,
+        end: datetime.timedelta | None = None,
+        refresh: bool = False,
+    ):
+        media = self.instance(Media, url, refresh)
+        return self.submit(
+            ("media", "audio", url, select, start, end), lambda: media.audio(select, start, end)
+        ).result()
+
+    def media_converted(
+        self,
+        url: Url,
+        bitrate: Audio.Bitrate,
+        samplerate: Audio.Samplerate,
+        format: Audio.Format,
+        channels: Audio.Channels,
+        refresh: bool = False,
+    ):
+        media = self.instance(Media, url, refresh)
+        return self.submit(
+            ("media", "converted", url, bitrate, samplerate.per_second, format, channels),
+            lambda: media.audio().converted(bitrate=bitrate, samplerate=samplerate, format=format, channels=channels),
+        ).result()
+
+    def playlist_info(self, url: Url, refresh: bool = False):
+        playlist = self.instance(Playlist, url, refresh)
+        return self.submit(("playlist", "info", url), lambda: playlist.info).result()
+
+    def playlist_items(self, url: Url, start: int | None = None, stop: int | None = None, refresh: bool = False):
+        playlist = self.instance(Playlist, url, refresh)
+        return list(self.submit(("playlist", "items", url), lambda: playlist.items).result()[start:stop].addresses)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        server: "Service.HttpServer | Service.UnixServer"
+
+        def address_string(self):
+            if isinstance(self.client_address, tuple):
+                return super().address_string()
+            return "unix"
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: dict[str, str] = {}):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, status: int, value: typing.Any, headers: dict[str, str] = {}):
+            self._send(status, json.dumps(value).encode(), "application/json", headers)
+
+        def _parsed(self, service: "Service", path: str, query: dict[str, str]):
+            if path == "/stats":
+                return lambda: self._json(200, service.stats)
+            url = Url(query["url"])
+            refresh = query.get("refresh", "0") not in ("0", "false", "")
+            if path == "/media/info":
+                return lambda: self._json(200, service.media_info(url, refresh))
+            if path == "/media/audio":
+                select = (
+                    Audio.Format(query["format"]) if "format" in query else Audio.Bitrate(query.get("bitrate", 320))
+                )
+                start = datetime.timedelta(seconds=float(query["start"])) if "start" in query else None
+                end = datetime.timedelta(seconds=float(query["end"])) if "end" in query else None
+                return lambda: self._send(
+                    200, service.media_audio(url, select, start, end, refresh).data, "application/octet-stream"
+                )
+            if path == "/media/converted":
+                bitrate = Audio.Bitrate(query.get("bitrate", 128))
+                samplerate = Audio.Samplerate(query.get("samplerate", 48000))
+                format = Audio.Format(query.get("format", "mp3"))
+                channels = Audio.Channels[query.get("channels", "stereo")]
+                if format.samplerates and (samplerate.per_second not in format.samplerates):
+                    raise ValueError(f"{format} does not support samplerate {samplerate}")
+                return lambda: self._send(
+                    200,
+                    service.media_converted(url, bitrate, samplerate, format, channels, refresh).data,
+                    "application/octet-stream",
+                )
+            if path == "/playlist/info":
+                return lambda: self._json(200, service.playlist_info(url, refresh))
+            if path == "/playlist/items":
+                start = int(query["start"]) if "start" in query else None
+                stop = int(query["stop"]) if "stop" in query else None
+                return lambda: self._json(200, service.playlist_items(url, start, stop, refresh))
+            return None
+
+        def do_GET(self):
+            parsed = urllib.parse.urlparse(self.path)
+            query = {k: v[-1] for k, v in urllib.parse.parse_qs(parsed.query).items()}
+            try:
+                respond = self._parsed(self.server.service, parsed.path, query)
+            except (KeyError, ValueError) as e:
+                return self._json(400, {"error": repr(e)})
+            if respond is None:
+                return self._json(404, {"error": f"Unknown path {parsed.path}"})
+            try:
+                return respond()
+            except Service.Overloaded as e:
+                return self._json(503, {"error": str(e)}, {"Retry-After": "1"})
+            except ValueError as e:
+                return self._json(502, {"error": repr(e)})
+            except Exception as e:
+                return self._json(500, {"error": repr(e)})
+
+    class HttpServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+        daemon_threads = True
+        service: "Service"
+
+    if hasattr(socket, "AF_UNIX"):
+
+        class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+            service: "Service"
+
+    @functools.cached_property
+    def server(self):
+        if isinstance(self.address, str):
+            result = Service.UnixServer(self.address, Service.Handler)
+        else:
+            result = Service.HttpServer(self.address, Service.Handler)
+        result.service = self
+        return result
+
+    def serve(self):
+        self.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
@@ -2,3 +2,5 @@ from .Audio import Audio as Audio
 from .Playlist import Playlist as Playlist
 from .Url import Url as Url
 from .Media import Media as Media
+from .Service import Service as Service
+from .Flight import Flight as Flight
@@ -0,0 +1,22 @@
+import argparse
+import datetime
+
+from .Service import Service
+
+parser = argparse.ArgumentParser(prog="yoop", description="Serve yoop operations over HTTP or unix socket")
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8080)
+parser.add_argument("--socket", help="unix socket path, overrides host and port")
+parser.add_argument("--workers", type=int, default=4)
+parser.add_argument("--depth", type=int, default=64)
+parser.add_argument("--cached", type=int, default=1024)
+parser.add_argument("--ttl", type=float, default=600, help="seconds before cached metadata is extracted again")
+args = parser.parse_args()
+
+Service(
+    address=args.socket or (args.host, args.port),
+    workers=args.workers,
+    depth=args.depth,
+    cached=args.cached,
+    ttl=datetime.timedelta(seconds=args.ttl),
+).serve()